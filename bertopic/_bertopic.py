@@ -1869,7 +1869,8 @@ class BERTopic:
                                    normalize_frequency: bool = False,
                                    custom_labels: bool = False,
                                    width: int = 1250,
-                                   height: int = 900) -> go.Figure:
+                                   height: int = 900,
+                                   debug_tables: str = "figure") -> go.Figure:
         """ Visualize topics per class
 
         Arguments:
@@ -1882,9 +1883,16 @@ class BERTopic:
                        `topic_model.set_topic_labels`.
             width: The width of the figure.
             height: The height of the figure.
+            debug_tables: How to return the tables that show how the percentages
+                          were calculated when `as_percentage=True`. Either
+                          "figure" to render them as plotly tables, "dataframe"
+                          to return them as pandas DataFrames, or "none" to skip
+                          creating them.
 
         Returns:
-            A plotly.graph_objects.Figure including all traces
+            A tuple with a plotly.graph_objects.Figure including all traces
+            followed by the percentage table and the denominator table, in the
+            format selected by `debug_tables`
 
         Examples:
 
@@ -1912,7 +1920,8 @@ class BERTopic:
                                                    normalize_frequency=normalize_frequency,
                                                    custom_labels=custom_labels,
                                                    width=width,
-                                                   height=height)
+                                                   height=height,
+                                                   debug_tables=debug_tables)
 
     def visualize_distribution(self,
                                probabilities: np.ndarray,
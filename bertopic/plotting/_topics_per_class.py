@@ -1,8 +1,8 @@
 from typing import List
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from sklearn.preprocessing import normalize
 
 
 def visualize_topics_per_class(
@@ -16,13 +16,16 @@ def visualize_topics_per_class(
     custom_labels: bool = False,
     width: int = 1250,
     height: int = 900,
+    debug_tables: str = "figure",
 ) -> go.Figure:
     """Visualize topics per class
 
     Arguments:
         topic_model: A fitted BERTopic instance.
         topics_per_class: The topics you would like to be visualized with the
-                          corresponding topic representation
+                          corresponding topic representation. Categorical `Topic`
+                          and `Class` columns are converted to plain values first
+                          as they are much slower to group and compare.
         top_n_topics: To visualize the most frequent topics instead of all
         topics: Select which topics you would like to be visualized
         normalize_frequency: Whether to normalize each topic's frequency individually
@@ -30,9 +33,16 @@ def visualize_topics_per_class(
                        `topic_model.set_topic_labels`.
         width: The width of the figure.
         height: The height of the figure.
+        debug_tables: How to return the tables that show how the percentages
+                      were calculated when `as_percentage=True`. Either
+                      "figure" to render them as plotly tables, "dataframe"
+                      to return them as pandas DataFrames, or "none" to skip
+                      creating them.
 
     Returns:
-        A plotly.graph_objects.Figure including all traces
+        A tuple with a plotly.graph_objects.Figure including all traces
+        followed by the percentage table and the denominator table, in the
+        format selected by `debug_tables`
 
     Examples:
 
@@ -52,7 +62,28 @@ def visualize_topics_per_class(
     <iframe src="../../getting_started/visualization/topics_per_class.html"
     style="width:1400px; height: 1000px; border: 0px;""></iframe>
     """
-    colors = [
+    if debug_tables not in ("figure", "dataframe", "none"):
+        raise ValueError(
+            "Make sure that `debug_tables` is either 'figure', 'dataframe' or 'none'."
+        )
+
+    # Categorical columns take slow paths in the groupby and lookups below
+    if isinstance(topics_per_class["Topic"].dtype, pd.CategoricalDtype):
+        topics_per_class = topics_per_class.assign(
+            Topic=topics_per_class["Topic"].astype("int64")
+        )
+    if isinstance(topics_per_class["Class"].dtype, pd.CategoricalDtype):
+        topics_per_class = topics_per_class.assign(
+            Class=topics_per_class["Class"].astype(object)
+        )
+    if denomenators_per_class is not None and isinstance(
+        denomenators_per_class["Class"].dtype, pd.CategoricalDtype
+    ):
+        denomenators_per_class = denomenators_per_class.assign(
+            Class=denomenators_per_class["Class"].astype(object)
+        )
+
+    colors = (
         "#E69F00",
         "#56B4E9",
         "#009E73",
@@ -60,187 +91,218 @@ def visualize_topics_per_class(
         "#D55E00",
         "#0072B2",
         "#CC79A7",
-    ]
+    )
 
     # Select topics based on top_n and topics args
-    freq_df = topic_model.get_topic_freq()
-    freq_df = freq_df.loc[freq_df.Topic != -1, :]
     if topics is not None:
         selected_topics = list(topics)
-    elif top_n_topics is not None:
-        selected_topics = sorted(freq_df.Topic.to_list()[:top_n_topics])
     else:
-        selected_topics = sorted(freq_df.Topic.to_list())
+        freq_df = topic_model.get_topic_freq()
+        freq_df = freq_df.loc[freq_df.Topic != -1, :]
+        if top_n_topics is not None:
+            selected_topics = sorted(freq_df.Topic.to_list()[:top_n_topics])
+        else:
+            selected_topics = sorted(freq_df.Topic.to_list())
 
     # Prepare data
-    if topic_model.custom_labels_ is not None and custom_labels:
-        topic_names = {
-            key: topic_model.custom_labels_[key + topic_model._outliers]
-            for key, _ in topic_model.topic_labels_.items()
-        }
+    topic_labels = topic_model.topic_labels_
+    custom_topic_labels = topic_model.custom_labels_
+    if custom_topic_labels is not None and custom_labels:
+        outliers = topic_model._outliers
+        topic_names = {key: custom_topic_labels[key + outliers] for key in topic_labels}
     else:
         topic_names = {
             key: value[:40] + "..." if len(value) > 40 else value
-            for key, value in topic_model.topic_labels_.items()
+            for key, value in topic_labels.items()
         }
     topics_per_class["Name"] = topics_per_class.Topic.map(topic_names)
 
     data = topics_per_class.loc[topics_per_class.Topic.isin(selected_topics), :]
+    grouped = dict(tuple(data.groupby("Topic", sort=False)))
 
     # Add traces
 
-    topic_per_class_fig = go.Figure()
     topic_per_class_table_fig = go.Figure()
     total_topic_per_class_table_fig = go.Figure()
 
-    tables = pd.DataFrame()
+    table_rows = []
+    bar_traces = []
+    if as_percentage:
+        xaxis_title = "Frequency (%)"
+    elif normalize_frequency:
+        xaxis_title = "Normalized Frequency"
+    else:
+        xaxis_title = "Frequency"
 
-    for _, topic in enumerate(selected_topics):
-        if _ == 0:
+    # Index the denominators by class once so each lookup is a hash lookup,
+    # keeping the first denominator of a class if it appears more than once
+    if denomenators_per_class is not None:
+        denom_lookup = denomenators_per_class.drop_duplicates("Class")
+        denom_lookup = denom_lookup.set_index("Class")["Denomenator"]
+
+    color_array = [colors[i % len(colors)] for i in range(len(selected_topics))]
+    for idx, topic in enumerate(selected_topics):
+        if idx == 0:
             visible = True
         else:
             visible = "legendonly"
-        trace_data = data.loc[data.Topic == topic, :]
-        topic_name = trace_data.Name.values[0]
-        words = trace_data.Words.values
+        if topic not in grouped:
+            continue
+        trace_data = grouped[topic]
+        freq = trace_data["Frequency"].to_numpy(copy=False)
+        classes = trace_data["Class"].to_numpy(copy=False)
+        words = trace_data["Words"].to_numpy(copy=False)
+        topic_name = trace_data["Name"].iat[0]
 
-        if normalize_frequency:
-            x = normalize(trace_data.Frequency.values.reshape(1, -1))[0]
-            xaxis_title = "Normalized Frequency"
         if as_percentage:
-            x = []
-            debug_info = []
-            numerators = []
-            denomenators = []
-            percentages = []
-
-            for _, class_name in enumerate(trace_data.Class):
-                numerator = trace_data.loc[
-                    trace_data.Class == class_name, "Frequency"
-                ].values[0]
-                denomenator = (
-                    denomenators_per_class.loc[
-                        denomenators_per_class.Class == class_name, "Denomenator"
-                    ]
-                    .values[0]
-                    .item()
-                    if denomenators_per_class is not None
-                    else trace_data.Frequency.sum()
-                )  # i think the else is right but idk
-                numerators.append(numerator)
-                denomenators.append(denomenator)
-                x.append(numerator / denomenator)
-                percent_str = f"{numerator / denomenator:.2%}"
-                percentages.append(percent_str)
-
-                debug_info.append(
-                    f"Equation: <em>{numerator} / {denomenator}</em> = <em>{percent_str}</em>"
+            numerators = freq
+            if denomenators_per_class is not None:
+                denomenators = trace_data["Class"].map(denom_lookup)
+                missing = denomenators.isna()
+                if missing.any():
+                    missing_classes = trace_data["Class"][missing].unique().tolist()
+                    raise ValueError(
+                        "Make sure that `denomenators_per_class` contains a "
+                        f"denominator for every class. Missing: {missing_classes}"
+                    )
+                denomenators = denomenators.to_numpy()
+            else:
+                denomenators = np.full_like(freq, freq.sum())
+            x = numerators / denomenators
+            percentages = [f"{value:.2%}" for value in x]
+            debug_info = [
+                f"Equation: <em>{numerator} / {denomenator}</em> = <em>{percentage}</em>"
+                for numerator, denomenator, percentage in zip(
+                    numerators, denomenators, percentages
                 )
+            ]
 
-            debug_table = pd.DataFrame(
-                {
-                    "Class": trace_data.Class.apply(lambda x: str.strip(x)),
-                    "Numerator": numerators,
-                    "Denomenator": denomenators,
-                    "Percentage": percentages,
-                    "Topic": topic_name,
-                }
+            if debug_tables != "none":
+                debug_table = pd.DataFrame(
+                    {
+                        "Class": trace_data["Class"].astype(str).str.strip().to_numpy(),
+                        "Numerator": numerators,
+                        "Denomenator": denomenators,
+                        "Percentage": percentages,
+                        "Topic": topic_name,
+                    }
+                )
+                table_rows.append(debug_table)
+            hovertext = np.array(
+                [f"{word}<br>{info}" for word, info in zip(words, debug_info)],
+                dtype=object,
             )
-            tables = pd.concat([tables, debug_table])
-            xaxis_title = "Frequency (%)"
         else:
-            x = trace_data.Frequency
-            xaxis_title = "Frequency"
-        topic_per_class_fig.add_trace(
+            x = freq / (np.linalg.norm(freq) or 1.0) if normalize_frequency else freq
+            hovertext = words
+        bar_traces.append(
             go.Bar(
-                y=trace_data.Class,
+                y=classes,
                 x=x,
                 visible=visible,
-                marker_color=colors[_ % 7],
+                marker_color=color_array[idx],
                 hoverinfo="text",
                 orientation="h",
                 name=topic_name,
                 # Show the words in the hover text and debug_info
-                hovertext=[
-                    f"{word}<br>{debug_info}"
-                    for word, debug_info in zip(words, debug_info)
-                ],
+                hovertext=hovertext,
             )
         )
 
-    topic_per_class_table_fig.add_trace(
-        go.Table(
-            header=dict(values=tables.columns.tolist(), align="left"),
-            name=topic_name,
-            cells=dict(values=tables.to_numpy().T.tolist(), align="left"),
-            # Make the last column the widest
-            columnwidth=[0.5, 0.3, 0.3, 0.3, 2, 0.1],
-        ),
-    )
-    if denomenators_per_class is not None:
-        denomenators_per_class.rename(
-            columns={"Denomenator": "Frequency"}, inplace=True
-        )
-        total_topic_per_class_table_fig.add_trace(
-            go.Table(
-                header=dict(
-                    values=denomenators_per_class.columns.tolist(), align="left"
-                ),
-                cells=dict(
-                    values=denomenators_per_class.to_numpy().T.tolist(), align="left"
-                ),
+    # Styling of the visualization, passed along with the traces so the
+    # figure is validated once instead of once per update call
+    topic_per_class_fig = go.Figure(
+        data=bar_traces,
+        layout=dict(
+            autosize=True,
+            yaxis=dict(title="Class", showgrid=True),
+            title={
+                "text": f"<b>Topics per Class - v2</b>",
+                "y": 0.95,
+                "x": 0.40,
+                "xanchor": "center",
+                "yanchor": "top",
+                "font": dict(size=22, color="Black"),
+            },
+            height=height,
+            width=width,
+            template="simple_white",
+            xaxis=dict(
+                title=xaxis_title,
+                showgrid=True,
+                tickformat=".0%" if as_percentage else "",
+            ),
+            hoverlabel=dict(
+                bgcolor="white", font_size=12, font_family="verdana", align="left"
+            ),
+            legend=dict(
+                title="<b>Global Topic Representation",
             ),
-        )
-
-    # Also append a trace just showing the denomenators
-
-    # Styling of the visualization
-    topic_per_class_fig.update_yaxes(showgrid=True)
-    topic_per_class_fig.update_xaxes(showgrid=True)
-    topic_per_class_fig.update_layout(
-        autosize=True,
-        xaxis_title=xaxis_title,
-        yaxis_title="Class",
-        title={
-            "text": f"<b>Topics per Class - v2</b>",
-            "y": 0.95,
-            "x": 0.40,
-            "xanchor": "center",
-            "yanchor": "top",
-            "font": dict(size=22, color="Black"),
-        },
-        height=height,
-        width=width,
-        template="simple_white",
-        xaxis=dict(
-            tickformat=".0%" if as_percentage else "",
-        ),
-        hoverlabel=dict(
-            bgcolor="white", font_size=12, font_family="verdana", align="left"
-        ),
-        legend=dict(
-            title="<b>Global Topic Representation",
         ),
     )
-    updatemenu = {
-        "buttons": [
-            {
-                "label": c,
-                "method": "update",
-                "args": [
-                    {
-                        "cells": {
-                            "values": tables.T.values
-                            if c == "All"
-                            else tables.loc[tables["Topic"].eq(c)].T.values
+
+    # The debug tables only exist for percentages, so skip them otherwise
+    tables = denominators = None
+    if table_rows:
+        tables = pd.concat(table_rows, ignore_index=True)
+        if denomenators_per_class is not None:
+            denominators = denomenators_per_class.rename(
+                columns={"Denomenator": "Frequency"}
+            )
+
+    if debug_tables == "dataframe":
+        return topic_per_class_fig, tables, denominators
+    elif debug_tables == "none":
+        return topic_per_class_fig, None, None
+
+    if tables is not None:
+        # Build the cells per column to skip the object upcast and transpose
+        all_values = [tables[column].tolist() for column in tables.columns]
+        per_topic_values = {
+            c: [group[column].tolist() for column in group.columns]
+            for c, group in tables.groupby("Topic", sort=False)
+        }
+        updatemenu = {
+            "buttons": [
+                {
+                    "label": c,
+                    "method": "update",
+                    "args": [
+                        {
+                            "cells": {
+                                "values": (
+                                    all_values if c == "All" else per_topic_values[c]
+                                )
+                            }
                         }
-                    }
-                ],
-            }
-            for c in ["All"] + tables["Topic"].unique().tolist()
-        ],
-    }
-    topic_per_class_table_fig["layout"].update(updatemenus=[{}, updatemenu, {}])
+                    ],
+                }
+                for c in ["All"] + list(per_topic_values.keys())
+            ],
+        }
+        topic_per_class_table_fig = go.Figure(
+            data=go.Table(
+                header=dict(values=tables.columns.tolist(), align="left"),
+                name=topic_name,
+                cells=dict(values=all_values, align="left"),
+                # Make the last column the widest
+                columnwidth=[0.5, 0.3, 0.3, 0.3, 2, 0.1],
+            ),
+            layout=dict(updatemenus=[{}, updatemenu, {}]),
+        )
+        if denominators is not None:
+            total_topic_per_class_table_fig = go.Figure(
+                data=go.Table(
+                    header=dict(values=denominators.columns.tolist(), align="left"),
+                    cells=dict(
+                        values=[
+                            denominators[column].tolist()
+                            for column in denominators.columns
+                        ],
+                        align="left",
+                    ),
+                ),
+            )
 
     return (
         topic_per_class_fig,
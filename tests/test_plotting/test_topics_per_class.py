@@ -0,0 +1,115 @@
+import copy
+import pytest
+import numpy as np
+import pandas as pd
+
+
+@pytest.mark.parametrize('model', [('kmeans_pca_topic_model'),
+                                   ('base_topic_model'),
+                                   ('custom_topic_model'),
+                                   ('merged_topic_model'),
+                                   ('reduced_topic_model'),
+                                   ('online_topic_model')])
+@pytest.mark.parametrize('debug_tables', ["figure", "dataframe", "none"])
+def test_topics_per_class(model, debug_tables, documents, request):
+    topic_model = copy.deepcopy(request.getfixturevalue(model))
+    classes = [str(i % 5) for i in range(len(documents))]
+    topics_per_class = topic_model.topics_per_class(documents, classes=classes)
+    fig, tables, denominators = topic_model.visualize_topics_per_class(topics_per_class,
+                                                                       as_percentage=True,
+                                                                       top_n_topics=None,
+                                                                       debug_tables=debug_tables)
+
+    assert len(fig.to_dict()["data"]) == len(set(topic_model.topics_)) - topic_model._outliers
+    if debug_tables == "dataframe":
+        assert isinstance(tables, pd.DataFrame)
+        assert set(tables.Class) == set(classes)
+    elif debug_tables == "none":
+        assert tables is None and denominators is None
+
+
+def _topics_per_class(topic_model):
+    """ Two topics spread over two classes with known frequencies """
+    topic_a, topic_b = sorted(set(topic_model.topics_) - {-1})[:2]
+    topics_per_class = pd.DataFrame({"Topic": [topic_a, topic_a, topic_b, topic_b],
+                                     "Words": ["w1", "w2", "w3", "w4"],
+                                     "Frequency": [2, 6, 3, 9],
+                                     "Class": ["a", "b", "a", "b"]})
+    return topics_per_class, [topic_a, topic_b]
+
+
+@pytest.mark.parametrize('model', [('base_topic_model')])
+def test_topics_per_class_missing_denominator(model, request):
+    topic_model = copy.deepcopy(request.getfixturevalue(model))
+    topics_per_class, topics = _topics_per_class(topic_model)
+    denominators = pd.DataFrame({"Class": ["a"], "Denomenator": [10]})
+
+    with pytest.raises(ValueError, match="'b'"):
+        topic_model.visualize_topics_per_class(topics_per_class, denominators, topics=topics, as_percentage=True)
+
+
+@pytest.mark.parametrize('model', [('base_topic_model')])
+def test_topics_per_class_duplicate_denominator(model, request):
+    topic_model = copy.deepcopy(request.getfixturevalue(model))
+    topics_per_class, topics = _topics_per_class(topic_model)
+    denominators = pd.DataFrame({"Class": ["a", "b", "a"], "Denomenator": [10, 20, 1]})
+    fig, tables, _ = topic_model.visualize_topics_per_class(topics_per_class, denominators, topics=topics,
+                                                            as_percentage=True, debug_tables="dataframe")
+
+    assert list(fig.data[0].x) == [0.2, 0.3]
+    assert tables.Denomenator.tolist() == [10, 20, 10, 20]
+
+
+@pytest.mark.parametrize('model', [('base_topic_model')])
+def test_topics_per_class_denominators(model, request):
+    topic_model = copy.deepcopy(request.getfixturevalue(model))
+    topics_per_class, topics = _topics_per_class(topic_model)
+    denominators = pd.DataFrame({"Class": ["a", "b"], "Denomenator": [10, 20]})
+    fig, tables, _ = topic_model.visualize_topics_per_class(topics_per_class, denominators, topics=topics,
+                                                            as_percentage=True, debug_tables="dataframe")
+
+    assert list(fig.data[0].x) == [0.2, 0.3]
+    assert list(fig.data[1].x) == [0.3, 0.45]
+    assert tables.Denomenator.tolist() == [10, 20, 10, 20]
+    assert tables.Percentage.tolist() == ["20.00%", "30.00%", "30.00%", "45.00%"]
+    assert fig.data[0].marker.color == "#E69F00"
+    assert fig.data[1].marker.color == "#56B4E9"
+
+
+@pytest.mark.parametrize('model', [('base_topic_model')])
+def test_topics_per_class_categorical(model, request):
+    topic_model = copy.deepcopy(request.getfixturevalue(model))
+    topics_per_class, topics = _topics_per_class(topic_model)
+    denominators = pd.DataFrame({"Class": ["a", "b"], "Denomenator": [10, 20]})
+    categorical_topics_per_class = topics_per_class.astype({"Topic": "category", "Class": "category"})
+    categorical_denominators = denominators.astype({"Class": "category"})
+
+    fig, tables, totals = topic_model.visualize_topics_per_class(topics_per_class.copy(), denominators.copy(),
+                                                                 topics=topics, as_percentage=True,
+                                                                 debug_tables="dataframe")
+    categorical_fig, categorical_tables, categorical_totals = topic_model.visualize_topics_per_class(
+        categorical_topics_per_class, categorical_denominators, topics=topics, as_percentage=True,
+        debug_tables="dataframe")
+
+    assert categorical_fig.to_json() == fig.to_json()
+    assert categorical_tables.to_dict("list") == tables.to_dict("list")
+    assert categorical_totals.to_dict("list") == totals.to_dict("list")
+
+
+@pytest.mark.parametrize('model', [('base_topic_model')])
+@pytest.mark.parametrize('normalize_frequency', [False, True])
+def test_topics_per_class_frequency(model, normalize_frequency, request):
+    topic_model = copy.deepcopy(request.getfixturevalue(model))
+    topics_per_class, topics = _topics_per_class(topic_model)
+    fig, table_fig, total_fig = topic_model.visualize_topics_per_class(topics_per_class, topics=topics,
+                                                                       normalize_frequency=normalize_frequency)
+
+    if normalize_frequency:
+        for trace in fig.data:
+            assert np.isclose(np.linalg.norm(trace.x), 1)
+        assert np.allclose(fig.data[0].x, np.array([2, 6]) / np.linalg.norm([2, 6]))
+    else:
+        assert list(fig.data[0].x) == [2, 6]
+        assert list(fig.data[1].x) == [3, 9]
+    assert len(table_fig.data) == 0
+    assert len(total_fig.data) == 0